@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import joblib
+import json
+import io
 import os
-from sklearn.preprocessing import LabelEncoder
 
 # --- Debugging: Log Current Directory ---
 #st.write(f"Current working directory: {os.getcwd()}")
@@ -12,32 +14,54 @@ from sklearn.preprocessing import LabelEncoder
 model_path = 'gradient_boosting_model.pkl'
 features_path = 'gradient_boosting_features.pkl'
 label_encoder_target_path = 'product_category_label_encoder.pkl'
-data_path = 'data.csv'  # Assumes data.csv is in the repository's root directory
-
-# --- Alternative: Load data.csv from a GitHub raw URL ---
-# Uncomment and update the URL if using a GitHub raw URL for data.csv
-# data_url = 'https://raw.githubusercontent.com/your-username/your-repo/main/data.csv'
-# try:
-#     original_df = pd.read_csv(data_url)
-# except Exception as e:
-#     st.error(f"Error loading data from GitHub URL: {e}")
-#     st.stop()
+categories_path = 'categories.json'  # Generated from data.csv by build_categories.py
+categorical_features = ['store_location', 'Gender', 'Season', 'Size']
+numerical_features = ['Age', 'Total_Bill', 'transaction_qty']
+
+# --- Cached Loaders ---
+# Streamlit reruns this script on every widget interaction, so the categories
+# and pickled artifacts are loaded once and reused across reruns.
+@st.cache_data
+def load_categories(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+@st.cache_resource
+def load_model():
+    return joblib.load(model_path)
+
+@st.cache_resource
+def load_features():
+    return joblib.load(features_path)
+
+@st.cache_resource
+def load_label_encoder():
+    return joblib.load(label_encoder_target_path)
+
+def build_category_maps(categories, feature_index):
+    # The model was trained on one-hot columns named '<column>_<value>' with the first
+    # category dropped, so each value maps to the position of its feature column
+    # (None for the dropped one).
+    return {
+        col: {value: feature_index.get(f"{col}_{value}") for value in categories[col]}
+        for col in categorical_features
+    }
 
 # --- Load Data for Dropdowns ---
 try:
-    original_df = pd.read_csv(data_path)
-    unique_store_locations = sorted(original_df['store_location'].dropna().unique().tolist())
-    unique_genders = sorted(original_df['Gender'].dropna().unique().tolist())
-    unique_seasons = sorted(original_df['Season'].dropna().unique().tolist())
-    unique_sizes = sorted(original_df['Size'].dropna().unique().tolist())
+    categories = load_categories(categories_path)
+    unique_store_locations = categories['store_location']
+    unique_genders = categories['Gender']
+    unique_seasons = categories['Season']
+    unique_sizes = categories['Size']
 except FileNotFoundError:
-    st.error(f"Data file 'data.csv' not found at '{data_path}'. Ensure it is uploaded to the repository's root directory.")
+    st.error(f"Categories file '{categories_path}' not found. Run 'python build_categories.py' to generate it from data.csv.")
     st.stop()
 except KeyError as e:
-    st.error(f"Missing column in data file: {e}. Expected columns: store_location, Gender, Season, Size.")
+    st.error(f"Missing column in categories file: {e}. Expected columns: store_location, Gender, Season, Size.")
     st.stop()
 except Exception as e:
-    st.error(f"Error loading data: {e}")
+    st.error(f"Error loading categories: {e}")
     st.stop()
 
 # --- Load Trained Model and Artifacts ---
@@ -45,9 +69,7 @@ if not os.path.exists(model_path):
     st.error(f"Model file '{model_path}' not found at '{os.path.abspath(model_path)}'. Ensure it is uploaded to the repository's root directory.")
     st.stop()
 try:
-    model = joblib.load(model_path)
-    # Log model type for debugging
-    #st.write(f"Loaded model type: {type(model).__name__}")
+    model = load_model()
 except Exception as e:
     st.error(f"Error loading model file: {e}")
     st.write("This error may occur if the model depends on a library like 'xgboost'. Ensure 'xgboost' is included in requirements.txt.")
@@ -57,7 +79,7 @@ if not os.path.exists(features_path):
     st.error(f"Feature columns file '{features_path}' not found at '{os.path.abspath(features_path)}'. Ensure it is uploaded to the repository's root directory.")
     st.stop()
 try:
-    expected_features = joblib.load(features_path)
+    expected_features = load_features()
 except Exception as e:
     st.error(f"Error loading feature columns: {e}")
     st.stop()
@@ -67,11 +89,76 @@ if not os.path.exists(label_encoder_target_path):
     label_encoder_y = None
 else:
     try:
-        label_encoder_y = joblib.load(label_encoder_target_path)
+        label_encoder_y = load_label_encoder()
     except Exception as e:
         st.error(f"Error loading Target LabelEncoder: {e}")
         label_encoder_y = None
 
+# Column positions are fixed by the feature list, so resolve them once instead of per prediction
+feature_index = {feature: i for i, feature in enumerate(expected_features)}
+category_maps = build_category_maps(categories, feature_index)
+numerical_positions = [feature_index[col] for col in numerical_features]
+
+# Every category except the dropped reference one must have a feature column; otherwise
+# categories.json and the feature list are out of sync and values would be scored as the reference
+for col, value_map in category_maps.items():
+    unmapped = [value for value, j in value_map.items() if j is None]
+    if len(unmapped) != 1:
+        st.error(f"Categories file '{categories_path}' does not match feature columns file '{features_path}' for '{col}': "
+                 f"expected exactly one value without a feature column, found {len(unmapped)} ({', '.join(unmapped)}). "
+                 "Regenerate categories.json with 'python build_categories.py' from the data the model was trained on.")
+        st.stop()
+
+# --- Prediction Helpers ---
+def predict_batch(rows):
+    # One model.predict call per batch amortizes the per-call overhead across rows
+    return model.predict(rows)
+
+def encode_batch(df):
+    """Encode a DataFrame of raw inputs into a feature matrix in the model's column order."""
+    # float32 halves the bytes the tree traversal gathers compared to pandas' default float64
+    X = np.zeros((len(df), len(expected_features)), dtype=np.float32)
+    for col in numerical_features:
+        missing = df[col].isna()
+        if missing.any():
+            raise ValueError(f"Missing {col} values in rows: {', '.join(map(str, df.index[missing] + 1))}")
+    X[:, numerical_positions] = df[numerical_features].to_numpy(dtype=np.float32)
+    for col in categorical_features:
+        unknown = ~df[col].isin(category_maps[col].keys())
+        if unknown.any():
+            raise ValueError(f"Unknown {col} values: {', '.join(map(str, df.loc[unknown, col].unique()))}")
+        # Map every value to its one-hot column position in one vectorized pass;
+        # the dropped reference category maps to NaN and stays all-zero.
+        positions = df[col].map(category_maps[col])
+        hit = positions.notna().to_numpy()
+        X[np.flatnonzero(hit), positions[hit].astype(int).to_numpy()] = 1
+    return X
+
+@st.cache_data(max_entries=1024)
+def predict(store_location, gender, season, size, age, total_bill, transaction_qty):
+    """Predict the label for one set of inputs, memoized so repeated queries skip inference."""
+    # Pack inputs straight into a row vector at their precomputed positions
+    row = np.zeros((1, len(expected_features)), dtype=np.float32)
+    row[0, numerical_positions] = [age, total_bill, transaction_qty]
+
+    # One-hot encode categorical features with a single dict lookup each
+    for col, value in zip(categorical_features, [store_location, gender, season, size]):
+        j = category_maps[col][value]
+        if j is not None:
+            row[0, j] = 1
+    return predict_batch(row)[0]
+
+@st.cache_data(max_entries=16)
+def predict_uploaded(data):
+    """Predict every row of an uploaded CSV, cached on its bytes so reruns skip parsing and inference."""
+    batch_df = pd.read_csv(io.BytesIO(data), usecols=categorical_features + numerical_features)
+    predicted_labels = predict_batch(encode_batch(batch_df))
+    if label_encoder_y:
+        batch_df['Predicted Product Category'] = label_encoder_y.classes_[predicted_labels]
+    else:
+        batch_df['Predicted Product Category'] = predicted_labels.astype(int)
+    return batch_df, batch_df.to_csv(index=False).encode('utf-8')
+
 # --- Streamlit App Layout ---
 st.title("Product Category Prediction")
 st.header("Predict Suggested Product Category")
@@ -79,47 +166,29 @@ st.header("Predict Suggested Product Category")
 # --- Input Widgets ---
 st.subheader("Enter Customer and Transaction Details")
 
-# Categorical inputs
-store_location = st.selectbox("Store Location", unique_store_locations, help="Select the store location")
-gender = st.selectbox("Gender", unique_genders, help="Select the customer's gender")
-season = st.selectbox("Season", unique_seasons, help="Select the season")
-size = st.selectbox("Size", unique_sizes, help="Select the product size")
-
-# Numerical inputs
-age = st.number_input("Age", min_value=0, max_value=120, value=30, step=1, help="Customer's age")
-total_bill = st.number_input("Total Bill", min_value=0.0, value=100.0, step=0.1, help="Total bill amount")
-transaction_qty = st.number_input("Transaction Quantity", min_value=1, value=1, step=1, help="Number of items purchased")
-
-# --- Prediction Logic ---
-if st.button("Predict Product Category"):
-    # Create input dictionary
-    input_data = {
-        'store_location': store_location,
-        'Gender': gender,
-        'Season': season,
-        'Size': size,
-        'Age': age,
-        'Total_Bill': total_bill,
-        'transaction_qty': transaction_qty
-    }
-    input_df = pd.DataFrame([input_data])
+# Widgets inside a form only trigger a rerun when the form is submitted
+with st.form("predict"):
+    # Categorical inputs
+    store_location = st.selectbox("Store Location", unique_store_locations, help="Select the store location")
+    gender = st.selectbox("Gender", unique_genders, help="Select the customer's gender")
+    season = st.selectbox("Season", unique_seasons, help="Select the season")
+    size = st.selectbox("Size", unique_sizes, help="Select the product size")
 
-    # Apply LabelEncoding to categorical features
-    categorical_features = ['store_location', 'Gender', 'Season', 'Size']
-    for col in categorical_features:
-        if col in input_df.columns:
-            le = LabelEncoder()
-            le.fit(original_df[col].dropna().unique())
-            input_df[col] = le.transform(input_df[col])
+    # Numerical inputs
+    age = st.number_input("Age", min_value=0, max_value=120, value=30, step=1, help="Customer's age")
+    total_bill = st.number_input("Total Bill", min_value=0.0, value=100.0, step=0.1, help="Total bill amount")
+    transaction_qty = st.number_input("Transaction Quantity", min_value=1, value=1, step=1, help="Number of items purchased")
 
-    # Ensure input DataFrame matches expected features
-    input_df_processed = input_df.reindex(columns=expected_features, fill_value=0)
+    submitted = st.form_submit_button("Predict Product Category")
 
+# --- Prediction Logic ---
+if submitted:
     # Make prediction
     try:
-        predicted_label = model.predict(input_df_processed)[0]
+        predicted_label = predict(store_location, gender, season, size, age, total_bill, transaction_qty)
         if label_encoder_y:
-            predicted_category = label_encoder_y.inverse_transform([predicted_label])[0]
+            # Index the fitted classes directly rather than going through inverse_transform
+            predicted_category = label_encoder_y.classes_[predicted_label]
             st.success(f"Predicted Product Category: **{predicted_category}**")
         else:
             st.success(f"Predicted Product Category (Numerical Label): **{int(predicted_label)}**")
@@ -127,3 +196,22 @@ if st.button("Predict Product Category"):
         st.error(f"Error during prediction: {e}")
         st.write("Ensure input values match the model's expected features and the model is correctly loaded.")
 
+# --- Batch Prediction ---
+st.subheader("Batch Prediction from CSV")
+uploaded_file = st.file_uploader(
+    "Upload a CSV with columns: store_location, Gender, Season, Size, Age, Total_Bill, transaction_qty",
+    type="csv"
+)
+if uploaded_file is not None:
+    try:
+        batch_df, predictions_csv = predict_uploaded(uploaded_file.getvalue())
+        st.dataframe(batch_df)
+        st.download_button(
+            "Download Predictions",
+            predictions_csv,
+            file_name='predictions.csv',
+            mime='text/csv'
+        )
+    except Exception as e:
+        st.error(f"Error during batch prediction: {e}")
+        st.write("Ensure the uploaded CSV contains the expected columns and values seen during training.")
@@ -0,0 +1,46 @@
+"""Precompute the dropdown categories used by app.py.
+
+Run once whenever the training data changes:
+
+    python build_categories.py [data.csv | data.parquet]
+
+This writes categories.json, so the deployed app does not need to read
+the training data at all. Parquet input is read with column projection,
+so only the categorical columns are decoded.
+
+Requires pandas and pyarrow. pyarrow is only needed for this build step, not by
+the deployed app.
+"""
+import json
+import sys
+
+import pandas as pd
+
+data_path = 'data.csv'
+categories_path = 'categories.json'
+categorical_features = ['store_location', 'Gender', 'Season', 'Size']
+
+
+def read_categorical_columns(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=categorical_features)
+    return pd.read_csv(path, usecols=categorical_features, engine='pyarrow')
+
+
+def sorted_categories(series):
+    # category dtype hashes the column once, and its inferred categories are already
+    # the sorted non-null unique values, so no Series.unique() or Python sort is needed.
+    return series.astype('category').cat.categories.tolist()
+
+
+def build_categories(path):
+    df = read_categorical_columns(path)
+    return {col: sorted_categories(df[col]) for col in categorical_features}
+
+
+if __name__ == '__main__':
+    categories = build_categories(sys.argv[1] if len(sys.argv) > 1 else data_path)
+    with open(categories_path, 'w', encoding='utf-8') as f:
+        json.dump(categories, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"Wrote {categories_path} ({', '.join(f'{col}: {len(v)}' for col, v in categories.items())})")